@@ -7,6 +7,17 @@ class Settings:
     GOOGLE_MODEL = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash")
     TEMPERATURE = float(os.getenv("TEMPERATURE", 0.5))
     STREAMING = bool(os.getenv("disable_streaming", True))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", 64))
+    LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", 2))
+    LLM_MAX_BURST = int(os.getenv("LLM_MAX_BURST", 5))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+    LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", 1.0))
+    CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 512))
+    CHUNK_OVERLAP_LINES = int(os.getenv("CHUNK_OVERLAP_LINES", 0))
+    CHROMA_PERSIST_DIRECTORY = os.getenv("CHROMA_PERSIST_DIRECTORY", "shared_chroma_db")
+    VECTORSTORE_TTL_SECONDS = int(os.getenv("VECTORSTORE_TTL_SECONDS", 7 * 24 * 3600))
+    VECTORSTORE_GC_INTERVAL_SECONDS = int(os.getenv("VECTORSTORE_GC_INTERVAL_SECONDS", 3600))
     pass
 
 settings = Settings()
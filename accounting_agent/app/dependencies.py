@@ -5,6 +5,13 @@ from app.config import settings
 from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain.tools import Tool
+from langchain_core.rate_limiters import InMemoryRateLimiter
+import chromadb
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
 from income_statement.income_statement import Transaction, IncomeStatement
 import datetime
 
@@ -13,17 +20,168 @@ current_datetime = datetime.datetime.now()
 
 # Global transactions list
 transactions = []
+# Bumped on every write to the ledger so readers can tell when cached aggregates are stale
+ledger_version = 0
 
 # Setup LangChain Agent
 memory = MemorySaver()
+# Token bucket shared by every model call, including each step of the ReAct loop
+rate_limiter = InMemoryRateLimiter(
+    requests_per_second=settings.LLM_REQUESTS_PER_SECOND,
+    max_bucket_size=settings.LLM_MAX_BURST,
+)
 model = ChatGoogleGenerativeAI(
     model=settings.GOOGLE_MODEL, 
     temperature=settings.TEMPERATURE, 
+    rate_limiter=rate_limiter,
 )
 search = DuckDuckGoSearchRun(max_results=2)
 embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
-vectorstore = Chroma(
-    collection_name="main_collection", persist_directory="shared_chroma_db", embedding_function=embeddings)
+
+# Every conversation gets its own collection in the shared store, so retrieval only
+# searches that conversation's chunks and expired conversations can be dropped whole
+chroma_client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIRECTORY)
+CONVERSATION_COLLECTION_PREFIX = "conv_"
+vectorstores = {}
+# When each collection was last used by this process, and when that was last written to its metadata
+last_used = {}
+last_persisted = {}
+# Collections being deleted, whether the store is being compacted, and how many callers are using it
+deleting = set()
+compacting = False
+active_uses = 0
+# Guards the state above; it is never held during Chroma I/O, so taking it on the event loop is cheap
+vectorstores_lock = threading.Lock()
+vectorstores_changed = threading.Condition(vectorstores_lock)
+
+def conversation_collection_name(conversation_id: str) -> str:
+    """Maps a conversation id to a valid Chroma collection name."""
+    digest = hashlib.sha1(conversation_id.encode("utf-8")).hexdigest()[:32]
+    return f"{CONVERSATION_COLLECTION_PREFIX}{digest}"
+
+def touch_vectorstore(conversation_id: str):
+    """
+    Records that a conversation was used, pushing back the expiry of its documents.
+
+    Only updates memory, so it is safe to call on the event loop; persist_last_used writes it to Chroma.
+    """
+    with vectorstores_lock:
+        last_used[conversation_collection_name(conversation_id)] = time.time()
+
+@contextmanager
+def use_vectorstore(conversation_id: str) -> Iterator[Chroma]:
+    """
+    Provides the vectorstore holding the documents of a conversation, creating it if needed.
+
+    Waits while the collection is being deleted or the store compacted, and keeps both from
+    starting until the with block exits. Blocks on Chroma I/O, so run it in a worker thread.
+    """
+    global active_uses
+
+    name = conversation_collection_name(conversation_id)
+    with vectorstores_changed:
+        while name in deleting or compacting:
+            vectorstores_changed.wait()
+        # Marking the collection used first keeps the garbage collector from expiring it from here on
+        last_used[name] = time.time()
+        active_uses += 1
+        vectorstore = vectorstores.get(name)
+    try:
+        if vectorstore is None:
+            vectorstore = Chroma(
+                client=chroma_client,
+                collection_name=name,
+                collection_metadata={"conversation_id": conversation_id, "last_used": time.time()},
+                embedding_function=embeddings,
+            )
+            with vectorstores_lock:
+                vectorstore = vectorstores.setdefault(name, vectorstore)
+        yield vectorstore
+    finally:
+        with vectorstores_changed:
+            active_uses -= 1
+            vectorstores_changed.notify_all()
+
+@contextmanager
+def exclusive_vectorstore() -> Iterator[None]:
+    """Waits until nothing uses the vectorstore and keeps it unused until the with block exits."""
+    global compacting
+
+    with vectorstores_changed:
+        while compacting:
+            vectorstores_changed.wait()
+        compacting = True
+        while active_uses:
+            vectorstores_changed.wait()
+    try:
+        yield
+    finally:
+        with vectorstores_changed:
+            compacting = False
+            vectorstores_changed.notify_all()
+
+def persist_last_used():
+    """Writes the last_used timestamps recorded in memory since the last call to the collections' metadata."""
+    with vectorstores_lock:
+        pending = {name: used for name, used in last_used.items() if used > last_persisted.get(name, 0)}
+
+    for name, used in pending.items():
+        try:
+            collection = chroma_client.get_collection(name)
+        except Exception:
+            # The conversation has no documents, or they were garbage collected
+            with vectorstores_lock:
+                if last_used.get(name) == used:
+                    del last_used[name]
+            continue
+        collection.modify(metadata={**(collection.metadata or {}), "last_used": used})
+        with vectorstores_lock:
+            last_persisted[name] = used
+
+def expire_vectorstore(name: str, cutoff: float) -> bool:
+    """
+    Deletes a conversation's collection if it has not been used since cutoff.
+
+    Args:
+        name: Name of the collection
+        cutoff: Timestamp before which the collection counts as expired
+
+    Returns:
+        True if the collection was deleted
+    """
+    with vectorstores_lock:
+        if last_used.get(name, 0) >= cutoff:
+            return False
+    metadata = chroma_client.get_collection(name).metadata or {}
+    if metadata.get("last_used", 0) >= cutoff:
+        return False
+
+    with vectorstores_lock:
+        # Checked again, as the conversation may have been used while the metadata was read
+        if last_used.get(name, 0) >= cutoff:
+            return False
+        deleting.add(name)
+        vectorstores.pop(name, None)
+        last_used.pop(name, None)
+        last_persisted.pop(name, None)
+    try:
+        chroma_client.delete_collection(name)
+    finally:
+        with vectorstores_changed:
+            deleting.discard(name)
+            vectorstores_changed.notify_all()
+    return True
+
+# Reporting period of the income statement; transactions outside it are kept in the ledger but not reported
+STATEMENT_START_DATE = "2025-01-01"
+STATEMENT_END_DATE = "2025-12-31"
+
+def build_income_statement():
+    """Builds the income statement for the current contents of the ledger."""
+    income_statement = IncomeStatement("Jacko's Business", STATEMENT_START_DATE, STATEMENT_END_DATE, beginning_inventory=2000.00)
+    income_statement.set_ending_inventory(1500.00)  # This could be made configurable
+    income_statement.add_transactions(transactions)
+    return income_statement
 
 def add_transaction(date: str, description: str, amount: float, category: str, transaction_type: str) -> str:
     """
@@ -44,15 +202,16 @@ def add_transaction(date: str, description: str, amount: float, category: str, t
     if transaction_type not in valid_types:
         return f"Error: transaction_type must be one of {valid_types}"
     
+    global ledger_version
+
     # Create and add new transaction
     try:
         new_transaction = Transaction(date , description, float(amount), category, transaction_type)
         transactions.append(new_transaction)
+        ledger_version += 1
         
         # Create income statement with all transactions
-        income_statement = IncomeStatement("Jacko's Business", "2025-01-01", "2025-12-31", beginning_inventory=2000.00)
-        income_statement.set_ending_inventory(1500.00)  # This could be made configurable
-        income_statement.add_transactions(transactions)
+        income_statement = build_income_statement()
         
         # Export to Excel, overwriting previous file
         excel_file = income_statement.export_to_excel("output/income_statement.xlsx")
@@ -73,14 +232,15 @@ def add_transaction(date: str, description: str, amount: float, category: str, t
 transaction_tool = add_transaction
 
 def create_retrieval_tool(conversation_id: str):
-    retriever = vectorstore.as_retriever(
-        search_type="similarity",
-        search_kwargs={"filter": {"conversation_id": conversation_id}, "k": 10},
-    )
-
     def vectorstore_retrieval(query: str) -> str:
         """Retrieves relevant documents from the vectorstore based on the query."""
-        results = retriever.invoke(query)
+        # Looked up on every call, as the collection may have been garbage collected and recreated
+        with use_vectorstore(conversation_id) as vectorstore:
+            retriever = vectorstore.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": 10},
+            )
+            results = retriever.invoke(query)
         formatted_results = []
         
         for i, doc in enumerate(results):
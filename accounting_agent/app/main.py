@@ -1,9 +1,19 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import chat, home
+from app.routes import chat, home, ledger
 from app.utils.error_handler import add_exception_handlers
+from app.services.vectorstore_gc import vectorstore_gc_loop
 
-app = FastAPI(title="FastAPI LangChain Accountant")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Expire old conversations' documents and compact the vectorstore in the background
+    gc_task = asyncio.create_task(vectorstore_gc_loop())
+    yield
+    gc_task.cancel()
+
+app = FastAPI(title="FastAPI LangChain Accountant", lifespan=lifespan)
 
 # CORS Configuration
 app.add_middleware(
@@ -15,6 +25,8 @@ app.add_middleware(
 )
 
 # Include Routers
+# The ledger API must be registered before home, whose catch-all route serves public files
+app.include_router(ledger.router)
 app.include_router(home.router)
 app.include_router(chat.router)
 
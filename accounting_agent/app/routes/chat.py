@@ -3,9 +3,10 @@ from fastapi.responses import StreamingResponse
 import json
 import uuid
 from typing import List, Optional
-from app.services.chat_service import chat_stream
+from app.services.chat_service import chat_stream, start_chat
 import traceback
 from app.services.process_docs import process_documents
+from app.services.llm_gateway import GatewayOverloaded
 
 router = APIRouter()
 
@@ -26,11 +27,17 @@ async def chat(
         if files:
             sys_messages = await process_documents(files, conversation_id)
         
+        # Admission is decided here, so an overloaded gateway is a 503 rather than an error inside the stream
+        run = start_chat(message, conversation_id, sys_messages)
         return StreamingResponse(
-            chat_stream(message, conversation_id, sys_messages), 
+            chat_stream(run, conversation_id), 
             media_type="application/json"
         )
 
+    except GatewayOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in /chat endpoint: {e}\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Chat service error: {e}")
\ No newline at end of file
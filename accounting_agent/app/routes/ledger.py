@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Request, HTTPException, Query
+from fastapi.responses import Response
+from datetime import datetime
+from typing import Optional
+from app.services import ledger_service
+
+router = APIRouter()
+
+VALID_TRANSACTION_TYPES = ['revenue', 'expense', 'cost_of_sales', 'inventory']
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an ETag with the weak comparison of RFC 9110.
+
+    The header may list several ETags or be '*', and proxies that compress responses mark
+    the ETags they pass on as weak (W/"..."), which must still match.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_response(request: Request, key: tuple, compute) -> Response:
+    """Serves a memoized ledger aggregate, answering 304 when the client already has it."""
+    etag = ledger_service.make_etag(ledger_service.current_version(), key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = ledger_service.memoized(key, compute)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def validate_transaction_type(transaction_type: Optional[str]):
+    if transaction_type and transaction_type not in VALID_TRANSACTION_TYPES:
+        raise HTTPException(status_code=400, detail=f"transaction_type must be one of {VALID_TRANSACTION_TYPES}")
+
+
+def validate_date(name: str, value: Optional[str]):
+    if value:
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"{name} must be in YYYY-MM-DD format")
+
+
+@router.get("/ledger/totals")
+def ledger_totals(request: Request):
+    return cached_response(request, ("totals",), ledger_service.get_totals)
+
+
+@router.get("/ledger/timeseries")
+def ledger_timeseries(
+    request: Request,
+    interval: str = "month",
+    transaction_type: Optional[str] = None,
+):
+    if interval not in ledger_service.INTERVAL_FORMATS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of {list(ledger_service.INTERVAL_FORMATS)}")
+    validate_transaction_type(transaction_type)
+
+    return cached_response(
+        request,
+        ("timeseries", interval, transaction_type),
+        lambda: ledger_service.get_timeseries(interval, transaction_type),
+    )
+
+
+@router.get("/ledger/transactions")
+def ledger_transactions(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    category: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+):
+    try:
+        position = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if position < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    validate_transaction_type(transaction_type)
+    validate_date("start_date", start_date)
+    validate_date("end_date", end_date)
+
+    return cached_response(
+        request,
+        ("transactions", position, limit, category, transaction_type, start_date, end_date),
+        lambda: ledger_service.get_transactions_page(position, limit, category, transaction_type, start_date, end_date),
+    )
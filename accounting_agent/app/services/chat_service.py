@@ -8,7 +8,8 @@ import logging
 import sys
 import os
 from typing import Dict, Any
-from app.dependencies import transaction_tool
+from app.dependencies import transaction_tool, touch_vectorstore
+from app.services.llm_gateway import llm_gateway, GatewayOverloaded, RetriesExhausted
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -16,8 +17,12 @@ logging.basicConfig(level=logging.INFO,
 logger = logging.getLogger(__name__)
 
 
-async def chat_stream(data: str, conversation_id: str = "accountant", file_messages: list = []):
-    """Handles streaming chat responses from LangChain."""
+def start_chat(data: str, conversation_id: str = "accountant", file_messages: list = []):
+    """
+    Admits a chat message to the LLM gateway and starts answering it in the background.
+
+    Raises GatewayOverloaded if the gateway cannot take the request.
+    """
 
     logger.info(f"Processing chat message for conversation: {conversation_id}")
     
@@ -28,6 +33,9 @@ async def chat_stream(data: str, conversation_id: str = "accountant", file_messa
     if contains_stress_data:
         logger.info("Message contains stress analysis data")
 
+    # Every turn keeps the conversation's uploaded documents from expiring
+    touch_vectorstore(conversation_id)
+
     config = {"configurable": {"thread_id": conversation_id}}
     tools = [transaction_tool]
     agent_executor = create_react_agent(
@@ -63,20 +71,36 @@ Please confirm each transaction after it's been added and offer assistance with
         )
     )
 
-    try:
-        # Log the system messages that will be passed to the LLM
-        for msg in file_messages:
-            logger.info(f"System message: {msg[:100]}...")
-        
-        # Stream the response
-        async for chunk in agent_executor.astream({"messages": file_messages + [
-            HumanMessage(content=data)
-        ]}, config):
+    # Log the system messages that will be passed to the LLM
+    for msg in file_messages:
+        logger.info(f"System message: {msg[:100]}...")
+
+    async def produce(attempt: int):
+        # A retry resumes the interrupted run from its last checkpoint instead of resending the message
+        inputs = {"messages": file_messages + [HumanMessage(content=data)]} if attempt == 0 else None
+        async for chunk in agent_executor.astream(inputs, config):
             for key in chunk:
                 for message in chunk[key]['messages']:
                     yield json.dumps({"role": key, "message": message.content, "conversation_id": conversation_id}) + "\n"
+
+    # Repeated submissions of the same message share one run instead of adding it to the conversation twice
+    request_key = None if file_messages else (conversation_id, data)
+
+    return llm_gateway.submit(conversation_id, request_key, produce)
+
+
+async def chat_stream(run, conversation_id: str):
+    """Handles streaming chat responses from LangChain."""
+    try:
+        # Stream the response
+        async for line in run.subscribe():
+            yield line
         
         logger.info(f"Response generation completed for conversation: {conversation_id}")
+    except (GatewayOverloaded, RetriesExhausted) as e:
+        # Capacity problems are temporary, tell the client to send the message again later
+        logger.warning(f"Chat request for conversation {conversation_id} not completed: {e}")
+        yield json.dumps({"error": str(e), "retryable": True, "conversation_id": conversation_id}) + "\n"
     except Exception as e:
         logger.error(f"Error in chat_stream: {e}", exc_info=True)
         yield json.dumps({"error": str(e)}) + "\n"
\ No newline at end of file
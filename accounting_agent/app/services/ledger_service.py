@@ -0,0 +1,161 @@
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from typing import Callable, Optional
+
+from app import dependencies
+
+# Memoized response bodies, only valid for the ledger version they were built from
+MAX_CACHE_ENTRIES = 256
+_cache = {}
+_cache_version = None
+_cache_lock = threading.Lock()
+
+INTERVAL_FORMATS = {
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+
+
+def current_version() -> int:
+    """Returns the version number of the ledger."""
+    return dependencies.ledger_version
+
+
+def make_etag(version: int, key: tuple) -> str:
+    """Builds an ETag for a query against a given ledger version, without computing the response."""
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def memoized(key: tuple, compute: Callable[[], dict]) -> str:
+    """
+    Returns the serialized JSON body for key, computing it only once per ledger version.
+
+    Args:
+        key: Hashable description of the query (endpoint name and parameters)
+        compute: Function returning the response payload when it is not cached
+
+    Returns:
+        The JSON encoded response body
+    """
+    global _cache_version
+
+    version = current_version()
+    with _cache_lock:
+        if _cache_version != version:
+            # The ledger changed, every cached aggregate is stale
+            _cache.clear()
+            _cache_version = version
+        body = _cache.get(key)
+    if body is not None:
+        return body
+
+    body = json.dumps(compute())
+    with _cache_lock:
+        if _cache_version == version:
+            if len(_cache) >= MAX_CACHE_ENTRIES:
+                _cache.pop(next(iter(_cache)))
+            _cache[key] = body
+    return body
+
+
+def serialize_transaction(index: int, transaction) -> dict:
+    return {
+        "id": index,
+        "date": transaction.date.strftime("%Y-%m-%d"),
+        "description": transaction.description,
+        "amount": transaction.amount,
+        "category": transaction.category,
+        "transaction_type": transaction.transaction_type,
+    }
+
+
+def get_totals() -> dict:
+    """Returns the calculate_totals structure of the current income statement."""
+    return dependencies.build_income_statement().calculate_totals()
+
+
+def get_timeseries(interval: str = "month", transaction_type: Optional[str] = None) -> dict:
+    """
+    Returns per-category amounts bucketed by period for the transactions in the income statement.
+
+    Args:
+        interval: Bucket size, one of 'day', 'month' or 'year'
+        transaction_type: Only include transactions of this type if given
+
+    Returns:
+        A dict mapping transaction type to category to a list of {period, amount} points
+    """
+    date_format = INTERVAL_FORMATS[interval]
+    buckets = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+
+    for transaction in dependencies.build_income_statement().transactions:
+        if transaction_type and transaction.transaction_type != transaction_type:
+            continue
+        period = transaction.date.strftime(date_format)
+        buckets[transaction.transaction_type][transaction.category][period] += transaction.amount
+
+    series = {}
+    for t_type, categories in buckets.items():
+        series[t_type] = {
+            category: [{"period": period, "amount": amount} for period, amount in sorted(periods.items())]
+            for category, periods in categories.items()
+        }
+
+    return {"interval": interval, "series": series}
+
+
+def get_transactions_page(
+    cursor: int = 0,
+    limit: int = 50,
+    category: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> dict:
+    """
+    Returns a page of ledger transactions in the statement period matching the filters.
+
+    Only transactions within the income statement's period are returned, so pages add up to
+    the totals and time series. The ledger is append only, so a transaction's position is a
+    stable cursor.
+
+    Args:
+        cursor: Position in the ledger to start scanning from
+        limit: Maximum number of transactions to return
+        category: Only include transactions in this category if given
+        transaction_type: Only include transactions of this type if given
+        start_date: Only include transactions on or after this YYYY-MM-DD date if given
+        end_date: Only include transactions on or before this YYYY-MM-DD date if given
+
+    Returns:
+        A dict with the statement period, the matching transactions and the cursor of the next page
+        (None on the last page)
+    """
+    ledger = dependencies.transactions
+    period_start = max(start_date or "", dependencies.STATEMENT_START_DATE)
+    period_end = min(end_date or "9999-12-31", dependencies.STATEMENT_END_DATE)
+    items = []
+    index = cursor
+
+    while index < len(ledger) and len(items) < limit:
+        transaction = ledger[index]
+        index += 1
+        date = transaction.date.strftime("%Y-%m-%d")
+        if category and transaction.category != category:
+            continue
+        if transaction_type and transaction.transaction_type != transaction_type:
+            continue
+        if date < period_start or date > period_end:
+            continue
+        items.append(serialize_transaction(index - 1, transaction))
+
+    next_cursor = str(index) if index < len(ledger) else None
+    return {
+        "period": {"start_date": dependencies.STATEMENT_START_DATE, "end_date": dependencies.STATEMENT_END_DATE},
+        "transactions": items,
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import random
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Callable, Hashable, Optional
+
+from google.api_core.exceptions import ServiceUnavailable, TooManyRequests
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayOverloaded(Exception):
+    """Raised when the gateway's wait queue is full."""
+
+
+class RetriesExhausted(Exception):
+    """Raised when a request is still rate limited by the provider after every retry."""
+
+
+# Gemini reports quota errors as ResourceExhausted, a subclass of TooManyRequests
+RETRYABLE_ERRORS = (TooManyRequests, ServiceUnavailable)
+RETRYABLE_STATUS_CODES = (429, 503)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Returns True if error is a provider rate limit or temporary outage."""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    # Other HTTP clients' errors carry the response status
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and status in RETRYABLE_STATUS_CODES
+
+
+class _Broadcast:
+    """Buffers the lines of one in-flight request so any number of identical requests can replay them."""
+
+    def __init__(self):
+        self.lines = []
+        self.done = False
+        self.error = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def publish(self, line: str):
+        self.lines.append(line)
+        self._notify()
+
+    def finish(self, error: Optional[Exception] = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            while index < len(self.lines):
+                yield self.lines[index]
+                index += 1
+            if self.done:
+                if self.error:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class LLMGateway:
+    """
+    Admission control for LLM work.
+
+    At most max_concurrency requests run at once. Waiting requests are queued per tenant and
+    admitted round robin, so one busy tenant cannot starve the others, and new requests are
+    refused once max_queue are waiting. Identical in-flight requests share a single run, and
+    failures that look like provider rate limits are retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 64,
+        max_retries: int = 3,
+        retry_base_seconds: float = 1.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self._available = max_concurrency
+        self._waiting = OrderedDict()
+        self._waiting_count = 0
+        self._inflight = {}
+        self._tasks = set()
+
+    def _reserve(self, tenant: Hashable) -> Optional[asyncio.Future]:
+        """
+        Reserves a slot, or a place in the tenant's queue, without waiting.
+
+        Returns:
+            None if a slot was taken, otherwise a future resolved when the queued request is admitted
+        """
+        if self._available > 0 and not self._waiting:
+            self._available -= 1
+            return None
+        if self._waiting_count >= self.max_queue:
+            raise GatewayOverloaded("Too many requests in progress, please retry shortly")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(tenant, deque()).append(future)
+        self._waiting_count += 1
+        return future
+
+    async def _wait(self, tenant: Hashable, future: Optional[asyncio.Future]):
+        if future is None:
+            return
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation, pass it on
+                self._release()
+            else:
+                queue = self._waiting.get(tenant)
+                if queue is not None and future in queue:
+                    queue.remove(future)
+                    self._waiting_count -= 1
+                    if not queue:
+                        del self._waiting[tenant]
+            raise
+
+    def _release(self):
+        while self._waiting:
+            tenant, queue = next(iter(self._waiting.items()))
+            future = queue.popleft()
+            self._waiting_count -= 1
+            if queue:
+                self._waiting.move_to_end(tenant)
+            else:
+                del self._waiting[tenant]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._available += 1
+
+    async def _run(
+        self,
+        tenant: Hashable,
+        admission: Optional[asyncio.Future],
+        produce: Callable[[int], AsyncIterator[str]],
+        broadcast: _Broadcast,
+    ):
+        try:
+            await self._wait(tenant, admission)
+        except asyncio.CancelledError:
+            broadcast.finish(GatewayOverloaded("Request was cancelled before it started, please retry"))
+            raise
+
+        try:
+            attempt = 0
+            while True:
+                try:
+                    async for line in produce(attempt):
+                        broadcast.publish(line)
+                    broadcast.finish()
+                    return
+                except Exception as e:
+                    if not is_retryable(e):
+                        broadcast.finish(e)
+                        return
+                    if attempt >= self.max_retries:
+                        broadcast.finish(RetriesExhausted(
+                            f"The model provider is rate limiting requests, please retry shortly ({e})"))
+                        return
+                    # Full jitter keeps retries from a burst from hitting the provider in lockstep
+                    delay = random.uniform(0, self.retry_base_seconds * 2 ** attempt)
+                    attempt += 1
+                    logger.warning(f"Retrying LLM request in {delay:.2f}s (attempt {attempt}) after: {e}")
+                    await asyncio.sleep(delay)
+        finally:
+            self._release()
+
+    def submit(
+        self,
+        tenant: Hashable,
+        key: Optional[Hashable],
+        produce: Callable[[int], AsyncIterator[str]],
+    ) -> _Broadcast:
+        """
+        Admits a request and starts running it in the background.
+
+        Admission is decided before returning, so callers can refuse the request up front.
+        The run is detached from its subscribers, so a disconnecting client does not cancel it
+        for the others, and a request nobody subscribes to still releases its slot.
+
+        Args:
+            tenant: Identity used for fair queueing
+            key: Identity of the request; requests with the same key already in flight share its output.
+                None disables coalescing.
+            produce: Called with the attempt number (0 for the first try) and returns the lines to stream.
+                Retries should resume the interrupted work rather than repeat it.
+
+        Returns:
+            The run, whose subscribe() yields the produced lines and raises the final error if it failed
+
+        Raises:
+            GatewayOverloaded: If the request would have to queue and the queue is full
+        """
+        if key is not None and key in self._inflight:
+            # Joining a run in flight needs no slot of its own
+            logger.info("Coalescing identical in-flight LLM request")
+            return self._inflight[key]
+
+        admission = self._reserve(tenant)
+        broadcast = _Broadcast()
+        task = asyncio.create_task(self._run(tenant, admission, produce, broadcast))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if key is not None:
+            self._inflight[key] = broadcast
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return broadcast
+
+    async def stream(
+        self,
+        tenant: Hashable,
+        key: Optional[Hashable],
+        produce: Callable[[int], AsyncIterator[str]],
+    ) -> AsyncIterator[str]:
+        """Submits a request and yields its output lines, see submit()."""
+        async for line in self.submit(tenant, key, produce).subscribe():
+            yield line
+
+
+llm_gateway = LLMGateway(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_base_seconds=settings.LLM_RETRY_BASE_SECONDS,
+)
@@ -1,11 +1,11 @@
 
 from fastapi import HTTPException, UploadFile
+import asyncio
 import os
 import mimetypes  # Import the mimetypes module
 import traceback
 import uuid
 from typing import List, Optional
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 
 from langchain_community.document_loaders import (
@@ -21,7 +21,9 @@ from langchain_community.document_loaders import (
     UnstructuredWordDocumentLoader,
 )
 from langchain_core.documents import Document
-from app.dependencies import vectorstore
+from app.config import settings
+from app.dependencies import use_vectorstore
+from app.utils.text_chunker import StructuredTextSplitter
 
 
 LOADER_MAPPING = {
@@ -63,12 +65,10 @@ def split_text(documents: list[Document]):
     Returns:
     list[Document]: List of Document objects representing the split text chunks.
     """
-    # Initialize text splitter with specified parameters
-    text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=300, # Size of each chunk in characters
-    chunk_overlap=100, # Overlap between consecutive chunks
-    length_function=len, # Function to compute the length of the text
-    add_start_index=True, # Flag to add start index to each chunk
+    # Split on paragraph, row and page boundaries into chunks sized in embedding tokens
+    text_splitter = StructuredTextSplitter(
+    chunk_tokens=settings.CHUNK_TOKENS, # Size of each chunk in tokens
+    overlap_lines=settings.CHUNK_OVERLAP_LINES, # Lines repeated between consecutive chunks
     )
 
     # Split documents into smaller chunks using text splitter
@@ -82,6 +82,11 @@ def split_text(documents: list[Document]):
 
     return chunks # Return the list of split text chunks
 
+def add_documents(conversation_id: str, documents: list[Document], ids: list[str]):
+    """Adds document chunks to the vectorstore of a conversation."""
+    with use_vectorstore(conversation_id) as vectorstore:
+        vectorstore.add_documents(documents=documents, ids=ids)
+
 async def process_documents(files: List[UploadFile], conversation_id: str):
     """Processes uploaded documents and adds them to the vectorstore."""
 
@@ -116,7 +121,8 @@ async def process_documents(files: List[UploadFile], conversation_id: str):
                 # Generate UUIDs for the documents
                 ids = [str(uuid.uuid4()) for _ in documents]
 
-                vectorstore.add_documents(documents=documents, ids=ids)
+                # Embedding and writing to Chroma block, so they run off the event loop
+                await asyncio.to_thread(add_documents, conversation_id, documents, ids)
 
                 messages.append(f"System: User uploaded document '{file.filename}'. This document is now available for answering relevant questions. You may use the vectorstore_retrieval tool to access the document.")
                 # Clean up the temporary file
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+
+from app.config import settings
+from app.dependencies import (
+    chroma_client,
+    conversation_collection_name,
+    exclusive_vectorstore,
+    expire_vectorstore,
+    persist_last_used,
+    use_vectorstore,
+    CONVERSATION_COLLECTION_PREFIX,
+)
+
+logger = logging.getLogger(__name__)
+
+# The single collection every upload went to before collections were split per conversation
+LEGACY_COLLECTION_NAME = "main_collection"
+MIGRATION_BATCH_SIZE = 500
+# Seconds compaction waits for Chroma's own connections to finish writing before giving up
+COMPACT_BUSY_TIMEOUT_SECONDS = 1
+
+
+def collect_expired_collections(ttl_seconds: int = settings.VECTORSTORE_TTL_SECONDS) -> list[str]:
+    """
+    Deletes the collections of conversations that have not been used within the TTL.
+
+    Args:
+        ttl_seconds: Seconds since a conversation was last used after which its chunks are deleted
+
+    Returns:
+        The names of the deleted collections
+    """
+    cutoff = time.time() - ttl_seconds
+    deleted = []
+
+    for collection in chroma_client.list_collections():
+        # Older chromadb versions return collection objects, newer ones return names
+        name = collection if isinstance(collection, str) else collection.name
+        if not name.startswith(CONVERSATION_COLLECTION_PREFIX):
+            continue
+
+        if expire_vectorstore(name, cutoff):
+            deleted.append(name)
+
+    return deleted
+
+
+def migrate_legacy_collection() -> int:
+    """
+    Moves the chunks of the legacy shared collection into per-conversation collections.
+
+    Stored embeddings are copied, so nothing is re-embedded. Migrated conversations count as used
+    now and expire after the TTL like any other. Chunks without a conversation_id are unreachable
+    and dropped. The legacy collection is deleted once all of its chunks are copied.
+
+    Returns:
+        The number of chunks migrated
+    """
+    try:
+        legacy = chroma_client.get_collection(LEGACY_COLLECTION_NAME)
+    except Exception:
+        return 0
+
+    migrated = 0
+    offset = 0
+    while True:
+        batch = legacy.get(
+            limit=MIGRATION_BATCH_SIZE, offset=offset, include=["embeddings", "documents", "metadatas"])
+        if not batch["ids"]:
+            break
+        offset += len(batch["ids"])
+
+        by_conversation = {}
+        for i, metadata in enumerate(batch["metadatas"]):
+            conversation_id = (metadata or {}).get("conversation_id")
+            if conversation_id:
+                by_conversation.setdefault(conversation_id, []).append(i)
+
+        for conversation_id, indexes in by_conversation.items():
+            # Creates the collection with the metadata the garbage collector expects
+            with use_vectorstore(conversation_id):
+                chroma_client.get_collection(conversation_collection_name(conversation_id)).upsert(
+                    ids=[batch["ids"][i] for i in indexes],
+                    embeddings=[batch["embeddings"][i] for i in indexes],
+                    documents=[batch["documents"][i] for i in indexes],
+                    metadatas=[batch["metadatas"][i] for i in indexes],
+                )
+            migrated += len(indexes)
+
+    chroma_client.delete_collection(LEGACY_COLLECTION_NAME)
+    return migrated
+
+
+def compact_vectorstore(persist_directory: str = settings.CHROMA_PERSIST_DIRECTORY) -> bool:
+    """
+    Reclaims the disk space left behind by deleted collections in the Chroma sqlite file.
+
+    The chromadb client has no vacuum of its own, so VACUUM runs on a separate connection while
+    uploads and retrievals are held back. It is skipped if Chroma still has the database busy.
+
+    Returns:
+        True if the store was compacted
+    """
+    db_path = os.path.join(persist_directory, "chroma.sqlite3")
+    if not os.path.exists(db_path):
+        return False
+
+    with exclusive_vectorstore():
+        connection = sqlite3.connect(db_path, timeout=COMPACT_BUSY_TIMEOUT_SECONDS)
+        try:
+            connection.execute("VACUUM")
+            return True
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            logger.warning(f"Skipped compacting the vectorstore, the database is busy: {e}")
+            return False
+        finally:
+            connection.close()
+
+
+def run_gc_cycle():
+    """Runs one garbage collection pass, compacting the store if anything was removed."""
+    persist_last_used()
+    deleted = collect_expired_collections()
+    if deleted:
+        logger.info(f"Deleted {len(deleted)} expired vectorstore collections")
+        compact_vectorstore()
+
+
+async def vectorstore_gc_loop(interval_seconds: int = settings.VECTORSTORE_GC_INTERVAL_SECONDS):
+    """Migrates the legacy collection, then periodically garbage collects and compacts the vectorstore."""
+    try:
+        migrated = await asyncio.to_thread(migrate_legacy_collection)
+        if migrated:
+            logger.info(f"Migrated {migrated} chunks from {LEGACY_COLLECTION_NAME} to per-conversation collections")
+            await asyncio.to_thread(compact_vectorstore)
+    except Exception as e:
+        logger.error(f"Error migrating {LEGACY_COLLECTION_NAME}: {e}", exc_info=True)
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(run_gc_cycle)
+        except Exception as e:
+            logger.error(f"Error in vectorstore garbage collection: {e}", exc_info=True)
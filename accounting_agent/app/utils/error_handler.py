@@ -8,7 +8,8 @@ def add_exception_handlers(app: FastAPI):
     async def http_exception_handler(request: Request, exc: HTTPException):
         return JSONResponse(
             status_code=exc.status_code,
-            content={"error": exc.detail}
+            content={"error": exc.detail},
+            headers=exc.headers
         )
     
     @app.exception_handler(Exception)
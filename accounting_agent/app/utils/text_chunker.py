@@ -0,0 +1,161 @@
+import math
+import re
+from typing import Callable, List, Tuple
+
+from langchain_core.documents import Document
+
+# text-embedding-004 accepts at most 2048 input tokens
+EMBEDDING_TOKEN_LIMIT = 2048
+DEFAULT_CHUNK_TOKENS = 512
+
+# A table row has columns separated by tabs, pipes or runs of spaces
+TABLE_ROW_PATTERN = re.compile(r"\t|\||\S {2,}\S")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the token count of text without calling a tokenizer.
+
+    Gemini models average ~4 characters per token on English, but split numbers into one token
+    per digit, so digits are counted one each; amounts such as Rs.1,234.56 would otherwise be
+    underestimated by half and chunks near the embedding limit silently truncated.
+    """
+    digits = sum(map(str.isdigit, text))
+    return math.ceil((len(text) - digits) / 4) + digits
+
+
+def is_table(lines: List[str]) -> bool:
+    """Returns True if most lines of a block look like table rows."""
+    rows = sum(1 for line in lines if TABLE_ROW_PATTERN.search(line))
+    return len(lines) > 1 and rows * 2 > len(lines)
+
+
+class StructuredTextSplitter:
+    """
+    Splits documents into chunks on paragraph and line boundaries, sized in tokens.
+
+    Documents are never merged, so pages loaded separately (e.g. by PyMuPDFLoader) stay in
+    separate chunks. Blank-line separated blocks such as tables are kept whole when they fit,
+    and oversized tables are split between rows with their header row repeated.
+    """
+
+    def __init__(
+        self,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        overlap_lines: int = 0,
+        length_function: Callable[[str], int] = estimate_tokens,
+    ):
+        """
+        Args:
+            chunk_tokens: Maximum size of a chunk in tokens
+            overlap_lines: Number of trailing lines of a chunk repeated at the start of the next one
+            length_function: Function returning the number of tokens in a text; the default is an
+                estimate, so chunk_tokens should stay below the embedding limit
+        """
+        if chunk_tokens > EMBEDDING_TOKEN_LIMIT:
+            raise ValueError(f"chunk_tokens must not exceed the embedding limit of {EMBEDDING_TOKEN_LIMIT}")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_lines = overlap_lines
+        self.length_function = length_function
+
+    def _blocks(self, text: str) -> List[List[Tuple[int, str]]]:
+        """Groups the non-empty lines of text, with their start offsets, into blank-line separated blocks."""
+        blocks = []
+        current = []
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            stripped = line.rstrip("\r\n")
+            if stripped.strip():
+                current.append((offset, stripped))
+            elif current:
+                blocks.append(current)
+                current = []
+            offset += len(line)
+        if current:
+            blocks.append(current)
+        return blocks
+
+    def _split_line(self, offset: int, line: str) -> List[Tuple[int, str]]:
+        """Hard splits a single line that is larger than a chunk, preferring word boundaries."""
+        pieces = []
+        while self.length_function(line) > self.chunk_tokens:
+            # Binary search the longest prefix that fits
+            low, high = 1, len(line)
+            while low < high:
+                mid = (low + high + 1) // 2
+                if self.length_function(line[:mid]) <= self.chunk_tokens:
+                    low = mid
+                else:
+                    high = mid - 1
+            cut = line.rfind(" ", 0, low)
+            cut = cut if cut > 0 else low
+            pieces.append((offset, line[:cut]))
+            offset += cut
+            line = line[cut:]
+        pieces.append((offset, line))
+        return pieces
+
+    def _units(self, block: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """Breaks a block into units of lines that each fit in a chunk."""
+        text = "\n".join(line for _, line in block)
+        if self.length_function(text) <= self.chunk_tokens:
+            return [block]
+
+        header = block[0] if is_table([line for _, line in block]) else None
+        units = []
+        for offset, line in block:
+            if self.length_function(line) > self.chunk_tokens:
+                units.extend([piece] for piece in self._split_line(offset, line))
+            else:
+                units.append([(offset, line)])
+        return self._pack(units, header)
+
+    def _pack(self, units, header=None, continued=None) -> List[List[Tuple[int, str]]]:
+        """
+        Greedily packs units of lines into chunks, overlapping and repeating the header if given.
+
+        continued flags the units that are later pieces of a split block; they already start with
+        the overlap of the piece before them, so nothing is carried over into them again.
+        """
+        chunks = []
+        current = []
+        for i, unit in enumerate(units):
+            candidate = current + unit
+            if current and self.length_function("\n".join(line for _, line in candidate)) > self.chunk_tokens:
+                chunks.append(current)
+                carries_overlap = continued is not None and continued[i]
+                carry = current[-self.overlap_lines:] if self.overlap_lines and not carries_overlap else []
+                if header:
+                    # Repeated headers have no offset of their own in the source text
+                    carry = [(None, header[1])] + [line for line in carry if line[0] not in (None, header[0])]
+                current = carry
+                # Drop carried lines that would not leave room for the next unit
+                while current and self.length_function("\n".join(line for _, line in current + unit)) > self.chunk_tokens:
+                    current = current[1:]
+                candidate = current + unit
+            current = candidate
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Split the text content of the given list of Document objects into smaller chunks.
+        Args:
+        documents (list[Document]): List of Document objects containing text content to split.
+        Returns:
+        list[Document]: List of Document objects representing the split text chunks, with a start_index metadata entry.
+        """
+        chunks = []
+        for document in documents:
+            units = []
+            continued = []
+            for block in self._blocks(document.page_content):
+                pieces = self._units(block)
+                units.extend(pieces)
+                continued.extend(i > 0 for i in range(len(pieces)))
+            for chunk in self._pack(units, continued=continued):
+                metadata = dict(document.metadata)
+                metadata["start_index"] = next(offset for offset, _ in chunk if offset is not None)
+                chunks.append(Document(page_content="\n".join(line for _, line in chunk), metadata=metadata))
+        return chunks
@@ -0,0 +1,140 @@
+"""
+Compares the structure-preserving chunker against the previous 300/100 character
+RecursiveCharacterTextSplitter settings on financial documents.
+
+For every configuration it reports the chunk count, the number of tokens and batched
+calls needed to embed the chunks, the share of table rows kept whole in some chunk and a
+lexical retrieval hit rate: each sampled row is used as a query (without its amount) and
+counts as a hit when a chunk holding the complete row ranks in the top k.
+
+Usage (from the accounting_agent directory):
+    python benchmarks/chunking_benchmark.py statement.pdf invoice.pdf --output chunking.json
+Without files, synthetic bank statement and invoice pages are used.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.utils.text_chunker import StructuredTextSplitter, estimate_tokens
+
+# GoogleGenerativeAIEmbeddings.embed_documents sends texts in batches of 100
+EMBEDDING_BATCH_SIZE = 100
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def synthetic_documents(pages, seed):
+    rng = random.Random(seed)
+    vendors = ["Acme Supplies", "City Utilities", "Metro Rent", "Globex Ltd", "Office Depot", "Payroll Run"]
+    documents = []
+    for page in range(pages):
+        rows = []
+        for i in range(rng.randint(25, 45)):
+            vendor = rng.choice(vendors)
+            rows.append(
+                f"2025-{page % 12 + 1:02d}-{i % 28 + 1:02d}  REF{page:03d}{i:03d}  {vendor} payment    Rs.{rng.uniform(10, 5000):,.2f}"
+            )
+        text = (
+            f"Statement of Account - Page {page + 1}\n"
+            "Jacko's Business, Account 0012-3345\n\n"
+            "Date  Reference  Description  Amount\n" + "\n".join(rows) + "\n\n"
+            "Please report any discrepancies within 30 days of the statement date. "
+            "Balances are shown in Rupees and include all cleared transactions.\n"
+        )
+        documents.append(Document(page_content=text, metadata={"source": "synthetic", "page": page}))
+    return documents
+
+
+def load_documents(paths):
+    documents = []
+    for path in paths:
+        if path.lower().endswith(".pdf"):
+            from langchain_community.document_loaders import PyMuPDFLoader
+            documents.extend(PyMuPDFLoader(path).load())
+        else:
+            with open(path, encoding="utf8") as f:
+                documents.append(Document(page_content=f.read(), metadata={"source": path}))
+    return documents
+
+
+def table_rows(documents):
+    rows = []
+    for document in documents:
+        for line in document.page_content.splitlines():
+            line = line.strip()
+            if re.search(r"\d", line) and len(WORD_PATTERN.findall(line)) >= 3:
+                rows.append(line)
+    return rows
+
+
+def cosine(a, b):
+    dot = sum(count * b[word] for word, count in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def evaluate(name, chunks, rows, k, rng):
+    contents = [chunk.page_content for chunk in chunks]
+    vectors = [Counter(WORD_PATTERN.findall(content.lower())) for content in contents]
+    intact = sum(1 for row in rows if any(row in content for content in contents))
+
+    hits = 0
+    sample = rng.sample(rows, min(len(rows), 200))
+    for row in sample:
+        query = Counter(WORD_PATTERN.findall(row.rsplit(" ", 1)[0].lower()))
+        ranked = sorted(range(len(contents)), key=lambda i: cosine(query, vectors[i]), reverse=True)[:k]
+        hits += any(row in contents[i] for i in ranked)
+
+    return {
+        "splitter": name,
+        "chunks": len(chunks),
+        "embedded_tokens": sum(estimate_tokens(content) for content in contents),
+        "embedding_calls": math.ceil(len(chunks) / EMBEDDING_BATCH_SIZE),
+        "rows_intact": intact / len(rows) if rows else None,
+        f"hit_at_{k}": hits / len(sample) if sample else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="*", help="PDF or text files to chunk")
+    parser.add_argument("--pages", type=int, default=50, help="Synthetic pages to generate when no files are given")
+    parser.add_argument("--chunk-tokens", type=int, default=512)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    documents = load_documents(args.files) if args.files else synthetic_documents(args.pages, args.seed)
+    rows = table_rows(documents)
+
+    splitters = {
+        "recursive_300_100": RecursiveCharacterTextSplitter(
+            chunk_size=300, chunk_overlap=100, length_function=len, add_start_index=True),
+        "structured": StructuredTextSplitter(chunk_tokens=args.chunk_tokens),
+        "structured_overlap_1": StructuredTextSplitter(chunk_tokens=args.chunk_tokens, overlap_lines=1),
+    }
+
+    results = []
+    for name, splitter in splitters.items():
+        chunks = splitter.split_documents(documents)
+        result = evaluate(name, chunks, rows, args.k, random.Random(args.seed))
+        results.append(result)
+        print(", ".join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmarks the income statement engine on synthetic ledgers of increasing size.
+
+Times add_transactions, calculate_totals, generate_statement and export_to_excel, and
+measures their peak memory with tracemalloc in a separate untimed run. Results are saved
+as JSON tagged with the current git commit so runs from different commits can be compared.
+
+Usage (from the accounting_agent directory):
+    python benchmarks/income_statement_benchmark.py --output baseline.json
+    python benchmarks/income_statement_benchmark.py --output current.json --compare baseline.json
+The default sizes go up to 1M transactions; pass --sizes 1000 ... 10000000 for the full
+range, which needs roughly 5 GB of memory for the 10M ledger.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from income_statement.income_statement import Transaction, IncomeStatement
+
+CATEGORIES = {
+    "revenue": ["Sales", "Services", "Interest Income", "Commissions"],
+    "cost_of_sales": ["Plus goods purchased or manufactured", "Direct Labor"],
+    "expense": ["Rent", "Utilities", "Payroll", "Marketing", "Office Supplies", "Equipment"],
+    "inventory": ["Stock"],
+}
+START_DATE = datetime.datetime(2025, 1, 1)
+
+
+def synthetic_ledger(size, seed):
+    rng = random.Random(seed)
+    types = list(CATEGORIES)
+    ledger = []
+    for i in range(size):
+        transaction_type = rng.choice(types)
+        ledger.append(Transaction(
+            START_DATE + datetime.timedelta(days=rng.randrange(365)),
+            f"Transaction {i}",
+            round(rng.uniform(1, 5000), 2),
+            rng.choice(CATEGORIES[transaction_type]),
+            transaction_type,
+        ))
+    return ledger
+
+
+def new_statement():
+    statement = IncomeStatement("Benchmark Business", "2025-01-01", "2025-12-31", beginning_inventory=2000.00)
+    statement.set_ending_inventory(1500.00)
+    return statement
+
+
+def loaded_statement(ledger):
+    statement = new_statement()
+    statement.add_transactions(ledger)
+    return statement
+
+
+def operations(ledger, output_directory):
+    """Returns (name, setup, operation) triples; setup runs outside the timed section."""
+    excel_file = os.path.join(output_directory, "income_statement.xlsx")
+    return [
+        ("add_transactions", new_statement, lambda statement: statement.add_transactions(ledger)),
+        ("calculate_totals", lambda: loaded_statement(ledger), lambda statement: statement.calculate_totals()),
+        ("generate_statement", lambda: loaded_statement(ledger), lambda statement: statement.generate_statement()),
+        ("export_to_excel", lambda: loaded_statement(ledger), lambda statement: statement.export_to_excel(excel_file)),
+    ]
+
+
+def measure(setup, operation, repeats):
+    timings = []
+    for _ in range(repeats):
+        statement = setup()
+        start = time.perf_counter()
+        operation(statement)
+        timings.append(time.perf_counter() - start)
+
+    statement = setup()
+    tracemalloc.start()
+    try:
+        operation(statement)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold, min_delta_s, min_delta_bytes):
+    """
+    Prints the change against a previous run and returns the number of regressions.
+
+    Times are compared on the fastest run, which is the least affected by scheduling noise.
+    A change only counts as a regression if it exceeds both the relative threshold and the
+    absolute floor, so sub-millisecond operations on small ledgers do not fail on jitter.
+    """
+    with open(baseline_path) as f:
+        baseline = {(r["operation"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for result in results:
+        previous = baseline.get((result["operation"], result["size"]))
+        if previous is None:
+            continue
+        time_ratio = result["min_s"] / previous["min_s"] if previous["min_s"] else 1.0
+        memory_ratio = result["peak_memory_bytes"] / previous["peak_memory_bytes"] if previous["peak_memory_bytes"] else 1.0
+        slower = time_ratio > 1 + threshold and result["min_s"] - previous["min_s"] > min_delta_s
+        larger = (
+            memory_ratio > 1 + threshold
+            and result["peak_memory_bytes"] - previous["peak_memory_bytes"] > min_delta_bytes
+        )
+        regressed = slower or larger
+        regressions += regressed
+        print(
+            f"{result['operation']:>18} size={result['size']:<9} "
+            f"time x{time_ratio:.2f} memory x{memory_ratio:.2f}{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--min-delta-kib", type=float, default=64, help="Ignore peak memory growth smaller than this")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as output_directory:
+        for size in args.sizes:
+            ledger = synthetic_ledger(size, args.seed)
+            for name, setup, operation in operations(ledger, output_directory):
+                result = {"operation": name, "size": size, **measure(setup, operation, args.repeats)}
+                results.append(result)
+                print(
+                    f"{name:>18} size={size:<9} median={result['median_s'] * 1000:.2f}ms "
+                    f"min={result['min_s'] * 1000:.2f}ms peak={result['peak_memory_bytes'] / 1024 / 1024:.2f}MiB"
+                )
+            del ledger
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "repeats": args.repeats,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare and compare(results, args.compare, args.threshold, args.min_delta_ms / 1000, args.min_delta_kib * 1024):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
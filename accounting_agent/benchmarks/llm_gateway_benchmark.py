@@ -0,0 +1,207 @@
+"""
+Load test of the LLM gateway against a local stub model.
+
+The stub behaves like a rate-limited provider: every call takes a fixed latency, and calls
+beyond its request quota (a token bucket) or its concurrency limit fail with a 429 error.
+Each chat request makes several sequential model calls, like a ReAct loop with tool use.
+Bursts of requests from several tenants, some of them repeated submissions, are sent:
+
+    direct        straight to the stub, giving up on the first failure
+    direct_retry  straight to the stub, restarting a failed request after a fixed delay
+    gateway       through LLMGateway, with langchain's InMemoryRateLimiter in front of every
+                  model call as in the app and retries resuming at the failed step; the
+                  client resubmits requests the gateway refuses or gives up on
+
+The gateway's concurrency cap and rate limit are set independently of the stub's limits, so
+429s, retries and resumption are exercised. Latency is the time until a request gets its
+answer. Requests still unanswered after --timeout seconds, and direct requests that failed,
+count as taking the full timeout, so the percentiles cover every request in every mode.
+
+Usage (from the accounting_agent directory):
+    python benchmarks/llm_gateway_benchmark.py --requests 500 --output llm_gateway.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.api_core.exceptions import ResourceExhausted
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from app.services.llm_gateway import GatewayOverloaded, LLMGateway, RetriesExhausted
+
+
+class StubModel:
+    def __init__(self, requests_per_second, burst, concurrency_limit, latency_seconds):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.concurrency_limit = concurrency_limit
+        self.latency_seconds = latency_seconds
+        self.tokens = burst
+        self.refilled_at = time.monotonic()
+        self.active = 0
+        self.calls = 0
+        self.rate_limited = 0
+
+    def _take_token(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.requests_per_second)
+        self.refilled_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        if self.active >= self.concurrency_limit or not self._take_token():
+            self.rate_limited += 1
+            raise ResourceExhausted("Resource has been exhausted (e.g. check quota).")
+        self.active += 1
+        try:
+            await asyncio.sleep(self.latency_seconds)
+            return f"answer to {prompt}"
+        finally:
+            self.active -= 1
+
+
+def workload(requests, tenants, duplicate_rate, seed):
+    rng = random.Random(seed)
+    items = []
+    for i in range(requests):
+        tenant = f"tenant-{rng.randrange(tenants)}"
+        if items and rng.random() < duplicate_rate:
+            tenant, prompt = rng.choice(items[-10:])
+        else:
+            prompt = f"message {i}"
+        items.append((tenant, prompt))
+    return items
+
+
+async def run(mode, items, args):
+    model = StubModel(args.provider_rps, args.provider_burst, args.provider_concurrency, args.latency)
+    gateway = LLMGateway(
+        max_concurrency=args.gateway_concurrency,
+        max_queue=len(items),
+        max_retries=args.retries,
+        retry_base_seconds=args.latency,
+    )
+    rate_limiter = InMemoryRateLimiter(
+        requests_per_second=args.gateway_rps,
+        max_bucket_size=args.gateway_burst,
+        check_every_n_seconds=args.latency / 2,
+    )
+    latencies = []
+    failures = 0
+    retries = 0
+    resubmissions = 0
+
+    def make_produce(prompt):
+        completed = []
+
+        async def produce(attempt):
+            nonlocal retries
+            retries += attempt > 0
+            # Like a LangGraph checkpoint, a retry resumes at the step that failed
+            for step in range(len(completed), args.steps):
+                await rate_limiter.aacquire()
+                completed.append(await model.ainvoke(f"{prompt} step {step}"))
+                yield completed[-1]
+        return produce
+
+    async def attempt(tenant, prompt):
+        if mode == "gateway":
+            async for _ in gateway.stream(tenant, (tenant, prompt), make_produce(prompt)):
+                pass
+        else:
+            for step in range(args.steps):
+                await model.ainvoke(f"{prompt} step {step}")
+
+    async def until_answered(tenant, prompt):
+        nonlocal resubmissions
+        while True:
+            try:
+                return await attempt(tenant, prompt)
+            except (ResourceExhausted, GatewayOverloaded, RetriesExhausted):
+                if mode == "direct":
+                    raise
+                resubmissions += 1
+                await asyncio.sleep(args.latency)
+
+    async def request(tenant, prompt, delay):
+        nonlocal failures
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(until_answered(tenant, prompt), args.timeout)
+            latencies.append(time.perf_counter() - start)
+        except (asyncio.TimeoutError, ResourceExhausted):
+            failures += 1
+            latencies.append(args.timeout)
+
+    # Requests arrive in bursts of burst_size every burst_interval seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        request(tenant, prompt, (i // args.burst_size) * args.burst_interval)
+        for i, (tenant, prompt) in enumerate(items)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    percentile = lambda pct: latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))]
+    return {
+        "mode": mode,
+        "requests": len(items),
+        "succeeded": len(items) - failures,
+        "failed": failures,
+        "model_calls": model.calls,
+        "rate_limited_calls": model.rate_limited,
+        "gateway_retries": retries,
+        "resubmissions": resubmissions,
+        "throughput_rps": (len(items) - failures) / elapsed,
+        "latency_p50_s": percentile(50),
+        "latency_p99_s": percentile(99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--tenants", type=int, default=10)
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--burst-size", type=int, default=100)
+    parser.add_argument("--burst-interval", type=float, default=0.5)
+    parser.add_argument("--provider-rps", type=float, default=200, help="Stub model calls allowed per second")
+    parser.add_argument("--provider-burst", type=int, default=30)
+    parser.add_argument("--provider-concurrency", type=int, default=16)
+    parser.add_argument("--gateway-concurrency", type=int, default=24)
+    parser.add_argument("--gateway-rps", type=float, default=250, help="InMemoryRateLimiter requests per second")
+    parser.add_argument("--gateway-burst", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per stub model call")
+    parser.add_argument("--steps", type=int, default=2, help="Model calls per chat request")
+    parser.add_argument("--retries", type=int, default=3, help="Retries within the gateway")
+    parser.add_argument("--timeout", type=float, default=10, help="Seconds after which a request counts as failed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    items = workload(args.requests, args.tenants, args.duplicate_rate, args.seed)
+    results = []
+    for mode in ("direct", "direct_retry", "gateway"):
+        random.seed(args.seed)
+        result = asyncio.run(run(mode, items, args))
+        results.append(result)
+        print(", ".join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
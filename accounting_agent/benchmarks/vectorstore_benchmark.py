@@ -0,0 +1,125 @@
+"""
+Compares retrieval latency and disk usage of a single shared Chroma collection filtered
+by conversation_id against one collection per conversation, as the number of stored
+conversations grows.
+
+Embeddings are random vectors of the same size as text-embedding-004, so the benchmark
+runs offline and measures only the vectorstore.
+
+Usage (from the accounting_agent directory):
+    python benchmarks/vectorstore_benchmark.py --conversations 10 100 1000 --output vectorstore.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import chromadb
+
+EMBEDDING_DIMENSIONS = 768
+
+
+def random_embeddings(rng, count):
+    return [[rng.random() for _ in range(EMBEDDING_DIMENSIONS)] for _ in range(count)]
+
+
+def collection_name(conversation_id):
+    # Mirrors app.dependencies.conversation_collection_name, which cannot be imported without model credentials
+    return "conv_" + hashlib.sha1(conversation_id.encode("utf-8")).hexdigest()[:32]
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def populate(client, layout, conversations, chunks_per_conversation, rng):
+    shared = client.get_or_create_collection("main_collection") if layout == "shared" else None
+    for conversation_id in conversations:
+        ids = [f"{conversation_id}-{i}" for i in range(chunks_per_conversation)]
+        documents = [f"chunk {i} of {conversation_id}" for i in range(chunks_per_conversation)]
+        metadatas = [{"conversation_id": conversation_id} for _ in ids]
+        embeddings = random_embeddings(rng, chunks_per_conversation)
+        if layout == "shared":
+            shared.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+        else:
+            collection = client.get_or_create_collection(
+                collection_name(conversation_id), metadata={"conversation_id": conversation_id, "last_used": time.time()})
+            collection.add(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+
+def query_latencies(client, layout, conversations, queries, rng):
+    latencies = []
+    shared = client.get_collection("main_collection") if layout == "shared" else None
+    for _ in range(queries):
+        conversation_id = rng.choice(conversations)
+        embedding = random_embeddings(rng, 1)
+        start = time.perf_counter()
+        if layout == "shared":
+            shared.query(query_embeddings=embedding, n_results=10, where={"conversation_id": conversation_id})
+        else:
+            client.get_collection(collection_name(conversation_id)).query(query_embeddings=embedding, n_results=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(layout, conversation_count, chunks_per_conversation, queries, seed):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix=f"chroma_bench_{layout}_")
+    try:
+        client = chromadb.PersistentClient(path=directory)
+        conversations = [f"conversation-{i}" for i in range(conversation_count)]
+        populate(client, layout, conversations, chunks_per_conversation, rng)
+        latencies = query_latencies(client, layout, conversations, queries, rng)
+        return {
+            "layout": layout,
+            "conversations": conversation_count,
+            "chunks": conversation_count * chunks_per_conversation,
+            "query_p50_ms": statistics.median(latencies),
+            "query_p95_ms": percentile(latencies, 95),
+            "disk_bytes": directory_size(directory),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--conversations", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--chunks-per-conversation", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for conversation_count in args.conversations:
+        for layout in ("shared", "per_conversation"):
+            result = run(layout, conversation_count, args.chunks_per_conversation, args.queries, args.seed)
+            results.append(result)
+            print(
+                f"{layout:>16} conversations={conversation_count:<6} "
+                f"p50={result['query_p50_ms']:.2f}ms p95={result['query_p95_ms']:.2f}ms "
+                f"disk={result['disk_bytes'] / 1024 / 1024:.1f}MiB"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
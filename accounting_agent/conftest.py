@@ -0,0 +1,8 @@
+# Puts the accounting_agent directory on sys.path so tests import app and income_statement like the server does
+import os
+import tempfile
+
+# app.dependencies builds the Gemini clients and opens the vectorstore on import; no calls are made
+# to Google in the tests, and the shared store in shared_chroma_db is left alone
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("CHROMA_PERSIST_DIRECTORY", tempfile.mkdtemp(prefix="chroma_test_"))
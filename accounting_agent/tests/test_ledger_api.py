@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import dependencies
+from app.routes import ledger
+from app.services import ledger_service
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # add_transaction writes the Excel report to output/ under the working directory
+    (tmp_path / "output").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(dependencies, "transactions", [])
+    monkeypatch.setattr(dependencies, "ledger_version", 0)
+    monkeypatch.setattr(ledger_service, "_cache", {})
+    monkeypatch.setattr(ledger_service, "_cache_version", None)
+
+    app = FastAPI()
+    app.include_router(ledger.router)
+    return TestClient(app)
+
+
+def test_unchanged_ledger_answers_304(client):
+    dependencies.add_transaction("2025-03-01", "Invoice", 100, "Sales", "revenue")
+    response = client.get("/ledger/totals")
+    etag = response.headers["etag"]
+
+    assert response.status_code == 200
+    assert client.get("/ledger/totals", headers={"If-None-Match": etag}).status_code == 304
+    # Weak validators added by compressing proxies, lists of ETags and * all match
+    for header in (f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/ledger/totals", headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+    assert client.get("/ledger/totals", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_new_transaction_changes_etag(client):
+    dependencies.add_transaction("2025-03-01", "Invoice", 100, "Sales", "revenue")
+    first = client.get("/ledger/totals")
+
+    dependencies.add_transaction("2025-03-02", "Invoice", 50, "Sales", "revenue")
+    second = client.get("/ledger/totals", headers={"If-None-Match": first.headers["etag"]})
+
+    assert dependencies.ledger_version == 2
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.json()["total_revenue"] == 150
+
+
+def test_transaction_pages_follow_cursor_and_filters(client):
+    for day in range(1, 8):
+        dependencies.add_transaction(f"2025-03-{day:02d}", f"Rent {day}", 10, "Rent", "expense")
+        dependencies.add_transaction(f"2025-03-{day:02d}", f"Invoice {day}", 20, "Sales", "revenue")
+    # Outside the statement period, so never listed
+    dependencies.add_transaction("2024-12-31", "Old invoice", 30, "Sales", "revenue")
+
+    descriptions = []
+    cursor = None
+    while True:
+        params = {"limit": 3, "transaction_type": "revenue", "start_date": "2025-03-02"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/ledger/transactions", params=params).json()
+        assert len(page["transactions"]) <= 3
+        descriptions.extend(transaction["description"] for transaction in page["transactions"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert descriptions == [f"Invoice {day}" for day in range(2, 8)]
+    assert page["period"] == {"start_date": "2025-01-01", "end_date": "2025-12-31"}
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/ledger/transactions", params={"cursor": "abc"}).status_code == 400
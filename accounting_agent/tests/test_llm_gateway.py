@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+from app.services.llm_gateway import GatewayOverloaded, LLMGateway, RetriesExhausted, is_retryable
+
+
+async def collect(run):
+    return [line async for line in run.subscribe()]
+
+
+def blocking_produce(release: asyncio.Event, started: list = None, name: str = None):
+    async def produce(attempt):
+        if started is not None:
+            started.append(name)
+        await release.wait()
+        yield name or "done"
+    return produce
+
+
+def test_waiting_tenants_are_admitted_round_robin():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=1, max_queue=10)
+        release = asyncio.Event()
+        started = []
+        blocker = gateway.submit("a", None, blocking_produce(release))
+        runs = [
+            gateway.submit(tenant, None, blocking_produce(release, started, name))
+            for tenant, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("b", "b2")]
+        ]
+        release.set()
+        await collect(blocker)
+        for run in runs:
+            await collect(run)
+        return started
+
+    assert asyncio.run(scenario()) == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_full_queue_is_refused_on_submit():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+        running = gateway.submit("a", None, blocking_produce(release))
+        queued = gateway.submit("b", None, blocking_produce(release))
+        with pytest.raises(GatewayOverloaded):
+            gateway.submit("c", None, blocking_produce(release))
+        release.set()
+        assert await collect(running) == ["done"]
+        assert await collect(queued) == ["done"]
+        # The queue drained, so new requests are admitted again
+        assert await collect(gateway.submit("c", None, blocking_produce(release))) == ["done"]
+        return gateway
+
+    gateway = asyncio.run(scenario())
+    assert gateway._available == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=1, max_queue=10)
+        release = asyncio.Event()
+        running = gateway.submit("a", None, blocking_produce(release))
+        running_tasks = set(gateway._tasks)
+        queued = gateway.submit("b", None, blocking_produce(release))
+        (waiting_task,) = gateway._tasks - running_tasks
+        await asyncio.sleep(0)
+        waiting_task.cancel()
+        with pytest.raises(GatewayOverloaded):
+            await collect(queued)
+        assert not gateway._waiting
+        assert gateway._waiting_count == 0
+
+        release.set()
+        await collect(running)
+        return gateway
+
+    gateway = asyncio.run(scenario())
+    assert gateway._available == 1
+
+
+def test_slot_handed_to_a_cancelled_waiter_is_passed_on():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=1, max_queue=10)
+        assert gateway._reserve("a") is None
+        admission = gateway._reserve("b")
+        waiter = asyncio.create_task(gateway._wait("b", admission))
+        await asyncio.sleep(0)
+
+        # The running request finishes and hands its slot over, then the waiter is cancelled
+        # before it gets to run
+        gateway._release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return gateway
+
+    gateway = asyncio.run(scenario())
+    assert gateway._available == 1
+    assert gateway._waiting_count == 0
+
+
+def test_identical_requests_share_one_run():
+    async def scenario():
+        gateway = LLMGateway(max_concurrency=1, max_queue=10)
+        release = asyncio.Event()
+        started = []
+        first = gateway.submit("a", "key", blocking_produce(release, started, "answer"))
+        second = gateway.submit("a", "key", blocking_produce(release, started, "answer"))
+        release.set()
+        lines = await asyncio.gather(collect(first), collect(second))
+        # Once the run is over, the same key starts a new one
+        await collect(gateway.submit("a", "key", blocking_produce(release, started, "answer")))
+        return first is second, lines, started
+
+    shared, lines, started = asyncio.run(scenario())
+    assert shared
+    assert lines == [["answer"], ["answer"]]
+    assert started == ["answer", "answer"]
+
+
+def test_retryable_errors_resume_with_later_attempts():
+    attempts = []
+
+    async def produce(attempt):
+        attempts.append(attempt)
+        if attempt == 0:
+            yield "step 1"
+            raise ResourceExhausted("Resource has been exhausted (e.g. check quota).")
+        yield "step 2"
+
+    gateway = LLMGateway(max_concurrency=1, max_retries=3, retry_base_seconds=0)
+
+    async def scenario():
+        return await collect(gateway.submit("a", None, produce))
+
+    assert asyncio.run(scenario()) == ["step 1", "step 2"]
+    assert attempts == [0, 1]
+    assert gateway._available == 1
+
+
+def test_retries_exhausted_after_max_retries():
+    attempts = []
+
+    async def produce(attempt):
+        attempts.append(attempt)
+        raise ResourceExhausted("Resource has been exhausted (e.g. check quota).")
+        yield
+
+    gateway = LLMGateway(max_concurrency=1, max_retries=2, retry_base_seconds=0)
+
+    async def scenario():
+        with pytest.raises(RetriesExhausted):
+            await collect(gateway.submit("a", None, produce))
+
+    asyncio.run(scenario())
+    assert attempts == [0, 1, 2]
+    assert gateway._available == 1
+
+
+def test_other_errors_are_not_retried():
+    attempts = []
+
+    async def produce(attempt):
+        attempts.append(attempt)
+        raise ValueError("Invoice 429 has an amount of 503.00")
+        yield
+
+    gateway = LLMGateway(max_concurrency=1, retry_base_seconds=0)
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await collect(gateway.submit("a", None, produce))
+
+    asyncio.run(scenario())
+    assert attempts == [0]
+
+
+def test_is_retryable_checks_type_and_status_code():
+    class HTTPError(Exception):
+        def __init__(self, status_code):
+            super().__init__(f"HTTP {status_code}")
+            self.status_code = status_code
+
+    assert is_retryable(ResourceExhausted("quota"))
+    assert is_retryable(HTTPError(503))
+    assert not is_retryable(HTTPError(400))
+    assert not is_retryable(RuntimeError("Transaction 429 failed"))
@@ -0,0 +1,69 @@
+from langchain_core.documents import Document
+
+from app.utils.text_chunker import StructuredTextSplitter, estimate_tokens
+
+HEADER = "Date  Ref  Description  Amount"
+ROWS = [f"2025-01-{i % 28 + 1:02d}  R{i:03d}  Row {i}    Rs.{i}.00" for i in range(60)]
+
+
+def split_table(overlap_lines):
+    document = Document(page_content="\n".join([HEADER] + ROWS), metadata={"page": 0})
+    return StructuredTextSplitter(chunk_tokens=100, overlap_lines=overlap_lines).split_documents([document])
+
+
+def test_split_table_rows_are_whole_and_headed():
+    chunks = split_table(overlap_lines=0)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        lines = chunk.page_content.split("\n")
+        assert lines[0] == HEADER
+        assert all(line in ROWS for line in lines[1:])
+    assert [line for chunk in chunks for line in chunk.page_content.split("\n")[1:]] == ROWS
+
+
+def test_split_table_overlap_is_applied_once():
+    chunks = split_table(overlap_lines=2)
+
+    previous_rows = None
+    for chunk in chunks:
+        lines = chunk.page_content.split("\n")
+        assert lines[0] == HEADER
+        rows = lines[1:]
+        assert len(rows) == len(set(rows))
+        assert HEADER not in rows
+        if previous_rows is not None:
+            assert rows[:2] == previous_rows[-2:]
+        previous_rows = rows
+    assert {line for chunk in chunks for line in chunk.page_content.split("\n")[1:]} == set(ROWS)
+
+
+def test_start_index_points_at_first_row_of_chunk():
+    chunks = split_table(overlap_lines=0)
+    text = "\n".join([HEADER] + ROWS)
+
+    for chunk in chunks[1:]:
+        first_row = chunk.page_content.split("\n")[1]
+        assert text[chunk.metadata["start_index"]:].startswith(first_row)
+        assert chunk.metadata["page"] == 0
+
+
+def test_split_prose_overlap_is_applied_once():
+    for line_count in range(6, 29):
+        lines = [f"{i} " + "lorem ipsum dolor sit amet " * 3 for i in range(line_count)]
+        document = Document(page_content="\n".join(lines), metadata={"page": 0})
+        chunks = StructuredTextSplitter(chunk_tokens=100, overlap_lines=2).split_documents([document])
+
+        previous = None
+        for chunk in chunks:
+            numbers = [int(line.split()[0]) for line in chunk.page_content.split("\n")]
+            assert numbers == sorted(set(numbers))
+            if previous is not None:
+                assert numbers[:2] == previous[-2:]
+            previous = numbers
+        assert previous[-1] == line_count - 1
+
+
+def test_digits_count_as_one_token_each():
+    assert estimate_tokens("Rs.1,234.56") >= 6
+    assert estimate_tokens("revenue") == 2
@@ -0,0 +1,104 @@
+import sqlite3
+import time
+
+import pytest
+
+from app import dependencies
+from app.config import settings
+from app.dependencies import chroma_client, conversation_collection_name, touch_vectorstore, use_vectorstore
+from app.services import vectorstore_gc
+
+DAY = 24 * 3600
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    yield
+    for collection in chroma_client.list_collections():
+        chroma_client.delete_collection(collection if isinstance(collection, str) else collection.name)
+    for state in (dependencies.vectorstores, dependencies.last_used, dependencies.last_persisted):
+        state.clear()
+
+
+def add_chunks(conversation_id, count, last_used):
+    with use_vectorstore(conversation_id):
+        collection = chroma_client.get_collection(conversation_collection_name(conversation_id))
+        collection.add(
+            ids=[f"{conversation_id}-{i}" for i in range(count)],
+            embeddings=[[float(i), 1.0, 0.0] for i in range(count)],
+            documents=[f"chunk {i}" for i in range(count)],
+        )
+        collection.modify(metadata={"conversation_id": conversation_id, "last_used": last_used})
+    # As after a restart, only the persisted timestamp is known
+    dependencies.last_used.clear()
+
+
+def collection_names():
+    return {c if isinstance(c, str) else c.name for c in chroma_client.list_collections()}
+
+
+def test_collections_unused_within_ttl_expire():
+    add_chunks("stale", 2, time.time() - 2 * DAY)
+    add_chunks("fresh", 2, time.time())
+
+    deleted = vectorstore_gc.collect_expired_collections(ttl_seconds=DAY)
+
+    assert deleted == [conversation_collection_name("stale")]
+    assert collection_names() == {conversation_collection_name("fresh")}
+
+
+def test_recent_use_in_memory_keeps_collection():
+    add_chunks("active", 2, time.time() - 2 * DAY)
+    touch_vectorstore("active")
+
+    assert vectorstore_gc.collect_expired_collections(ttl_seconds=DAY) == []
+
+    # Once persisted, the use survives a restart that forgets it in memory
+    dependencies.persist_last_used()
+    dependencies.last_used.clear()
+    assert vectorstore_gc.collect_expired_collections(ttl_seconds=DAY) == []
+
+
+def test_expired_conversation_gets_a_new_collection():
+    add_chunks("returning", 2, time.time() - 2 * DAY)
+    vectorstore_gc.collect_expired_collections(ttl_seconds=DAY)
+
+    with use_vectorstore("returning"):
+        assert chroma_client.get_collection(conversation_collection_name("returning")).count() == 0
+
+
+def test_migrate_legacy_collection_copies_embeddings():
+    legacy = chroma_client.create_collection(vectorstore_gc.LEGACY_COLLECTION_NAME)
+    count = vectorstore_gc.MIGRATION_BATCH_SIZE + 10
+    legacy.add(
+        ids=[f"chunk-{i}" for i in range(count)],
+        embeddings=[[float(i), 2.0, 3.0] for i in range(count)],
+        documents=[f"chunk {i}" for i in range(count)],
+        # Every tenth chunk predates conversation ids and cannot be attributed
+        metadatas=[{"conversation_id": f"c{i % 3}"} if i % 10 else {"source": "old.pdf"} for i in range(count)],
+    )
+
+    migrated = vectorstore_gc.migrate_legacy_collection()
+
+    assert migrated == count - count // 10
+    assert vectorstore_gc.LEGACY_COLLECTION_NAME not in collection_names()
+    copied = chroma_client.get_collection(conversation_collection_name("c1")).get(
+        ids=["chunk-1"], include=["embeddings", "metadatas"])
+    assert list(copied["embeddings"][0]) == [1.0, 2.0, 3.0]
+    assert copied["metadatas"][0]["conversation_id"] == "c1"
+    assert vectorstore_gc.collect_expired_collections(ttl_seconds=DAY) == []
+
+
+def test_compaction_is_skipped_while_the_database_is_busy(monkeypatch):
+    add_chunks("busy", 2, time.time())
+    monkeypatch.setattr(vectorstore_gc, "COMPACT_BUSY_TIMEOUT_SECONDS", 0)
+    writer = sqlite3.connect(f"{settings.CHROMA_PERSIST_DIRECTORY}/chroma.sqlite3")
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert vectorstore_gc.compact_vectorstore() is False
+    finally:
+        writer.rollback()
+        writer.close()
+
+    assert vectorstore_gc.compact_vectorstore() is True
+    assert dependencies.compacting is False